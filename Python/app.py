@@ -1,47 +1,164 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response
+import asyncio
 import cv2
+import logging
 import numpy as np
-import io
 import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _tj = TurboJPEG()
+except (ImportError, OSError, RuntimeError):  # PyTurboJPEG/libturbojpeg are optional
+    _tj = None
 
 app = FastAPI(title="360 Image Stitching API")
+log = logging.getLogger(__name__)
+
+# Long-lived so per-thread scratch buffers survive between requests.
+_decode_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+# Per-thread scratch buffers reused across calls with the same sizes.
+_scratch = threading.local()
+
+# Fixed-size equirectangular output buffers come from one small pool shared by
+# all threads, so the asyncio.to_thread executor does not pin a buffer per
+# worker. Panorama-sized arrays change shape every capture and are not pooled.
+_BUFFER_POOL_SIZE = 4
+_buffer_pool: list[np.ndarray] = []
+_buffer_pool_lock = threading.Lock()
+
+
+def _acquire_buffer(shape: tuple, dtype) -> np.ndarray:
+    with _buffer_pool_lock:
+        for i, buf in enumerate(_buffer_pool):
+            if buf.shape == shape and buf.dtype == dtype:
+                return _buffer_pool.pop(i)
+    return np.empty(shape, dtype)
+
+
+def _release_buffer(buf: np.ndarray):
+    with _buffer_pool_lock:
+        _buffer_pool.append(buf)
+        # Keep the most recently used buffers.
+        del _buffer_pool[:-_BUFFER_POOL_SIZE]
+
+
+# Uploads up to this size reuse the per-thread buffer; larger ones get a
+# one-off buffer so a single big file does not stay pinned per thread.
+MAX_POOLED_UPLOAD = 16 * 1024 * 1024
+
+
+def _upload_buffer(size: int) -> bytearray:
+    if size > MAX_POOLED_UPLOAD:
+        return bytearray(size)
+    buf = getattr(_scratch, "upload", None)
+    if buf is None or len(buf) < size:
+        buf = _scratch.upload = bytearray(size)
+    return buf
+
 
 def read_image(file: UploadFile) -> np.ndarray:
-    data = np.frombuffer(file.file.read(), np.uint8)
-    img = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    # SpooledTemporaryFile only has readinto from Python 3.11.
+    readinto = getattr(file.file, "readinto", None)
+    if file.size and readinto is not None:
+        # Read straight into a pooled buffer; decoding copies pixels out of it.
+        buf = _upload_buffer(file.size)
+        n = readinto(memoryview(buf)[:file.size])
+        data = np.frombuffer(buf, np.uint8, count=n)
+    else:
+        data = np.frombuffer(file.file.read(), np.uint8)
+    img = _decode(data)
     if img is None:
         raise ValueError("Invalid image file")
     return img
 
 
+def _exif_orientation(data: np.ndarray) -> int:
+    """EXIF orientation tag (0x0112) of a JPEG, or 1 when it has none."""
+    pos = 2
+    while pos + 4 <= len(data) and data[pos] == 0xFF:
+        marker = data[pos + 1]
+        length = int(data[pos + 2]) << 8 | int(data[pos + 3])
+        if marker == 0xDA:  # start of scan: no more metadata segments
+            break
+        segment = data[pos + 4:pos + 2 + length].tobytes()
+        if marker == 0xE1 and segment[:6] == b"Exif\0\0":
+            tiff = segment[6:]
+            try:
+                order = "<" if tiff[:2] == b"II" else ">"
+                ifd = struct.unpack_from(order + "I", tiff, 4)[0]
+                for i in range(struct.unpack_from(order + "H", tiff, ifd)[0]):
+                    tag, _, _, value = struct.unpack_from(order + "HHIH", tiff, ifd + 2 + 12 * i)
+                    if tag == 0x0112:
+                        return value
+            except struct.error:
+                pass
+            return 1
+        pos += 2 + length
+    return 1
+
+
+def _decode(data: np.ndarray) -> Optional[np.ndarray]:
+    # cv2.imdecode applies the EXIF orientation and libjpeg-turbo does not, so
+    # rotated camera JPEGs (and anything that is not a JPEG) go through OpenCV.
+    if (_tj is not None and data[:2].tobytes() == b"\xff\xd8"
+            and _exif_orientation(data) == 1):
+        width, height, _, _ = _tj.decode_header(data)
+        # Oversized inputs are reduced during the IDCT instead of by a later
+        # resize; _downscale_large then leaves them alone.
+        factor = min(_downscale_factor(width, height), 8)
+        scale = (1, factor) if factor > 1 else None
+        return _tj.decode(data, pixel_format=TJPF_BGR, scaling_factor=scale)
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+
+def _encode_webp(img: np.ndarray, quality: int = 90) -> bytes:
+    _, encoded = cv2.imencode(".webp", img, [cv2.IMWRITE_WEBP_QUALITY, quality])
+    return encoded.tobytes()
+
+
+def _encode_jpeg(img: np.ndarray, quality: int = 95) -> bytes:
+    if _tj is not None:
+        return _tj.encode(img, quality=quality, pixel_format=TJPF_BGR)
+    _, encoded = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded.tobytes()
+
+
+# Supported image extensions, matched case-insensitively
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png'})
+
+
 def load_images_from_folder(folder_path: str = "Images") -> List[np.ndarray]:
     """Load all images from the specified folder, sorted by filename."""
     folder = Path(folder_path)
     if not folder.exists():
         raise ValueError(f"Folder {folder_path} does not exist")
     
-    # Supported image extensions
-    image_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
-    
     # Get all image files and sort them
     image_files = sorted([
         f for f in folder.iterdir() 
-        if f.is_file() and f.suffix in image_extensions
+        if f.suffix.lower() in IMAGE_EXTENSIONS and f.is_file()
     ])
     
     if len(image_files) < 2:
         raise ValueError(f"Need at least 2 images, found {len(image_files)}")
     
+    # cv2.imread releases the GIL while decoding, so files decode concurrently.
+    with ThreadPoolExecutor(max_workers=min(len(image_files), os.cpu_count() or 1)) as pool:
+        decoded = list(pool.map(cv2.imread, map(str, image_files)))
+    
     images = []
-    for img_path in image_files:
-        img = cv2.imread(str(img_path))
+    for img_path, img in zip(image_files, decoded):
         if img is not None:
             images.append(img)
         else:
-            print(f"Warning: Could not load {img_path}")
+            log.warning("Could not load %s", img_path)
     
     if len(images) < 2:
         raise ValueError(f"Successfully loaded only {len(images)} images, need at least 2")
@@ -49,61 +166,387 @@ def load_images_from_folder(folder_path: str = "Images") -> List[np.ndarray]:
     return images
 
 
-def stitch_images(images: list[np.ndarray]) -> np.ndarray:
-    stitcher = cv2.Stitcher_create(cv2.Stitcher_PANORAMA)
-    status, pano = stitcher.stitch(images)
+def _cuda_available() -> bool:
+    try:
+        # cv2.cuda.warpAffine ships with the cudawarping contrib module only.
+        return hasattr(cv2.cuda, "warpAffine") and cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+USE_CUDA = _cuda_available()
+
+
+# Registration and seam estimation run on downscaled copies (in megapixels);
+# compositing uses the full input resolution (ORIG_RESOL == -1). Registration
+# stays at OpenCV's 0.6 MP default: at 0.3 MP too few features survive and
+# frames drop out of the panorama, for almost no time saved.
+REGISTRATION_RESOL = 0.6
+SEAM_ESTIMATION_RESOL = 0.08
+COMPOSITING_RESOL = -1.0
+# Inputs whose longer side exceeds this are downscaled by a power of two
+# until they fit, before stitching.
+MAX_INPUT_SIDE = 4096
+
+
+def _create_stitcher(mode: int) -> cv2.Stitcher:
+    stitcher = cv2.Stitcher_create(mode)
+    stitcher.setRegistrationResol(REGISTRATION_RESOL)
+    stitcher.setSeamEstimationResol(SEAM_ESTIMATION_RESOL)
+    stitcher.setCompositingResol(COMPOSITING_RESOL)
+    return stitcher
+
+
+def _downscale_factor(width: int, height: int) -> int:
+    """Smallest power of two that brings the longer side within MAX_INPUT_SIDE."""
+    factor = 1
+    while max(width, height) > MAX_INPUT_SIDE * factor:
+        factor *= 2
+    return factor
+
+
+def _downscale_large(images: list[np.ndarray]) -> list[np.ndarray]:
+    resized = []
+    for img in images:
+        h, w = img.shape[:2]
+        factor = _downscale_factor(w, h)
+        if factor > 1:
+            # Round up like libjpeg-turbo's scaled decode, so both paths agree.
+            img = cv2.resize(img, (-(-w // factor), -(-h // factor)),
+                             interpolation=cv2.INTER_AREA)
+        resized.append(img)
+    return resized
+
+
+class _DetailStitcher:
+    """Explicit cv2.detail pipeline exposing the Stitcher estimate/compose API.
+
+    Used instead of cv2.Stitcher on CUDA builds so that pairwise feature
+    matching and multi-band blending run on the GPU. ORB detection stays on
+    the CPU because cv2.detail.ImageFeatures keypoints are read-only from
+    Python, so cuda_ORB results cannot be handed to the matcher.
+
+    On every build it also does all compositing (see from_transform), so a
+    fresh registration and a reused transform blend identically; cv2.Stitcher
+    cannot take camera parameters back from Python.
+    """
+
+    work_megapix = REGISTRATION_RESOL
+    seam_megapix = SEAM_ESTIMATION_RESOL
+    conf_thresh = 1.0
+
+    def __init__(self):
+        self.finder = cv2.ORB_create(nfeatures=2000)
+        self._indices = None
+        self._cameras = None
+        self._work_scale = None
+        self.warped_scale = None
+
+    @classmethod
+    def from_transform(cls, cameras, indices: list[int], work_scale: float) -> "_DetailStitcher":
+        """Build a stitcher that composes with an already estimated transform."""
+        stitcher = cls()
+        stitcher._set_transform(cameras, indices, work_scale)
+        return stitcher
+
+    def _set_transform(self, cameras, indices: list[int], work_scale: float):
+        self._cameras = cameras
+        self._indices = [int(i) for i in np.ravel(indices)]
+        self._work_scale = work_scale
+        self.warped_scale = float(np.median([cam.focal for cam in cameras]))
+
+    def cameras(self):
+        return self._cameras
+
+    def component(self) -> list[int]:
+        """Indices of the input images kept by registration."""
+        return self._indices
+
+    def workScale(self) -> float:
+        return self._work_scale
+
+    @staticmethod
+    def _scale_for(img: np.ndarray, megapix: float) -> float:
+        return min(1.0, np.sqrt(megapix * 1e6 / (img.shape[0] * img.shape[1])))
+
+    @staticmethod
+    def _scaled_K(camera, scale: float) -> np.ndarray:
+        K = camera.K().astype(np.float32)
+        K[0, 0] *= scale
+        K[0, 2] *= scale
+        K[1, 1] *= scale
+        K[1, 2] *= scale
+        return K
+
+    def estimateTransform(self, images: list[np.ndarray]) -> int:
+        work_scale = self._scale_for(images[0], self.work_megapix)
+        features = [
+            cv2.detail.computeImageFeatures2(
+                self.finder,
+                cv2.resize(img, None, fx=work_scale, fy=work_scale,
+                           interpolation=cv2.INTER_LINEAR_EXACT))
+            for img in images
+        ]
+
+        matcher = cv2.detail_BestOf2NearestMatcher(try_use_gpu=True, match_conf=0.3)
+        matches = matcher.apply2(features)
+        matcher.collectGarbage()
+
+        indices = cv2.detail.leaveBiggestComponent(features, matches, self.conf_thresh)
+        if len(indices) < 2:
+            return cv2.Stitcher_ERR_NEED_MORE_IMGS
+        indices = [int(i) for i in np.ravel(indices)]
+        features = [features[i] for i in indices]
+        matches = matcher.apply2(features)
+
+        ok, cameras = cv2.detail_HomographyBasedEstimator().apply(features, matches, None)
+        if not ok:
+            return cv2.Stitcher_ERR_HOMOGRAPHY_EST_FAIL
+        for cam in cameras:
+            cam.R = cam.R.astype(np.float32)
+
+        adjuster = cv2.detail_BundleAdjusterRay()
+        adjuster.setConfThresh(self.conf_thresh)
+        ok, cameras = adjuster.apply(features, matches, cameras)
+        if not ok:
+            return cv2.Stitcher_ERR_CAMERA_PARAMS_ADJUST_FAIL
+
+        rmats = cv2.detail.waveCorrect([np.copy(cam.R) for cam in cameras],
+                                       cv2.detail.WAVE_CORRECT_HORIZ)
+        for cam, R in zip(cameras, rmats):
+            cam.R = R
+
+        self._set_transform(cameras, indices, work_scale)
+        return cv2.Stitcher_OK
+
+    def _warp_all(self, images: list[np.ndarray], scale: float):
+        """Warp images and their full masks onto the sphere at `scale` x work size."""
+        warper = cv2.PyRotationWarper("spherical", self.warped_scale * scale)
+        corners, warped, masks = [], [], []
+        for img, cam in zip(images, self._cameras):
+            K = self._scaled_K(cam, scale)
+            corner, img_wp = warper.warp(img, K, cam.R, cv2.INTER_LINEAR, cv2.BORDER_REFLECT)
+            full_mask = np.full(img.shape[:2], 255, np.uint8)
+            _, mask_wp = warper.warp(full_mask, K, cam.R, cv2.INTER_NEAREST, cv2.BORDER_CONSTANT)
+            corners.append(corner)
+            warped.append(img_wp)
+            masks.append(mask_wp)
+        return corners, warped, masks
+
+    def composePanorama(self, images: list[np.ndarray]) -> tuple[int, Optional[np.ndarray]]:
+        images = [images[i] for i in self._indices]
+
+        # Seams and exposure gains are estimated on low-resolution copies.
+        seam_scale = self._scale_for(images[0], self.seam_megapix)
+        seam_images = [cv2.resize(img, None, fx=seam_scale, fy=seam_scale,
+                                  interpolation=cv2.INTER_LINEAR_EXACT) for img in images]
+        seam_corners, seam_warped, seam_masks = self._warp_all(
+            seam_images, seam_scale / self._work_scale)
+
+        compensator = cv2.detail.ExposureCompensator_createDefault(
+            cv2.detail.ExposureCompensator_GAIN_BLOCKS)
+        compensator.feed(corners=seam_corners, images=seam_warped, masks=seam_masks)
+
+        seam_finder = cv2.detail_GraphCutSeamFinder("COST_COLOR")
+        seam_masks = seam_finder.find([img.astype(np.float32) for img in seam_warped],
+                                      seam_corners, seam_masks)
+
+        # Compose at full input resolution.
+        corners, warped, masks = self._warp_all(images, 1.0 / self._work_scale)
+        sizes = [(img.shape[1], img.shape[0]) for img in warped]
+        dst_roi = cv2.detail.resultRoi(corners=corners, sizes=sizes)
+        blend_width = np.sqrt(dst_roi[2] * dst_roi[3]) * 5 / 100
+        blender = cv2.detail_MultiBandBlender(try_gpu=1)
+        blender.setNumBands(int(np.log2(blend_width) - 1))
+        blender.prepare(dst_roi)
+
+        for idx, (corner, img_wp, mask_wp) in enumerate(zip(corners, warped, masks)):
+            compensator.apply(idx, corner, img_wp, mask_wp)
+            seam_mask = cv2.resize(cv2.dilate(seam_masks[idx], None),
+                                   (mask_wp.shape[1], mask_wp.shape[0]),
+                                   interpolation=cv2.INTER_LINEAR_EXACT)
+            blender.feed(img_wp.astype(np.int16), cv2.bitwise_and(seam_mask, mask_wp), corner)
+
+        pano, _ = blender.blend(None, None)
+        return cv2.Stitcher_OK, np.clip(pano, 0, 255).astype(np.uint8)
+
+
+# Camera parameters estimated for the last registration, as
+# (fingerprint, cameras, component, work_scale). A fixed rig produces the same
+# transform every capture, so callers that opt in with reuse_transform only
+# need to compose. The tuple is replaced as a whole and never mutated, so
+# readers need no lock and each request composes on its own stitcher.
+_cached_transform: Optional[tuple] = None
+
+
+def _estimate_transform(images: list[np.ndarray]):
+    if USE_CUDA:
+        stitcher = _DetailStitcher()
+    else:
+        stitcher = _create_stitcher(cv2.Stitcher_PANORAMA)
+    status = stitcher.estimateTransform(images)
+
+    if status != cv2.Stitcher_OK:
+        raise RuntimeError(f"Stitching failed with status {status}")
+
+    return stitcher
+
+
+def stitch_images(images: list[np.ndarray],
+                  reuse_transform: bool = False) -> np.ndarray:
+    global _cached_transform
+
+    images = _downscale_large(images)
+    fingerprint = tuple(img.shape for img in images)
+
+    # Hand-held captures share image shapes but not camera poses, so reusing
+    # the last transform is only correct for a fixed rig and must be asked for.
+    cached = _cached_transform
+    if reuse_transform and cached is not None and cached[0] == fingerprint:
+        try:
+            status, pano = _DetailStitcher.from_transform(*cached[1:]).composePanorama(images)
+        except cv2.error:
+            status = None
+        if status == cv2.Stitcher_OK:
+            return pano
+
+    # No usable cached transform (or the rig moved): register from scratch on a
+    # private stitcher, so concurrent registrations do not block each other.
+    stitcher = _estimate_transform(images)
+    transform = (stitcher.cameras(), stitcher.component(), stitcher.workScale())
+    # Compose through the same pipeline as the cached path, so reuse_transform
+    # changes only the speed, never the output. composePanorama blends the
+    # component estimateTransform kept, not every input.
+    status, pano = _DetailStitcher.from_transform(*transform).composePanorama(images)
 
     if status != cv2.Stitcher_OK:
         raise RuntimeError(f"Stitching failed with status {status}")
 
+    _cached_transform = (fingerprint,) + transform
     return pano
 
 
+def _equirect_affine(w: int, h: int, output_w: int, output_h: int) -> np.ndarray:
+    """Inverse (output -> panorama) affine transform of the equirectangular mapping."""
+    # phi / pi + 1 == 2 * x / output_w and theta / (pi / 2) + 1 == 2 * y / output_h,
+    # so the projection reduces to x * w / output_w, y * h / output_h: a pure
+    # axis-aligned scale that warpAffine evaluates without a per-pixel LUT.
+    return np.array([[w / output_w, 0, 0],
+                     [0, h / output_h, 0]], np.float64)
+
+
+# Size of the equirectangular image returned by the endpoints.
+EQUIRECT_W = 2048
+EQUIRECT_H = 1024
+
+
+def _warp_cuda(tiled: np.ndarray, affine: np.ndarray, dsize: tuple,
+               interpolation: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    stream = cv2.cuda_Stream()
+    g_tiled = cv2.cuda_GpuMat()
+    g_tiled.upload(tiled, stream)
+    g_equirect = cv2.cuda.warpAffine(
+        g_tiled,
+        affine,
+        dsize,
+        flags=interpolation | cv2.WARP_INVERSE_MAP,
+        borderMode=cv2.BORDER_REPLICATE,
+        stream=stream
+    )
+    equirect = g_equirect.download(stream, out)
+    stream.waitForCompletion()
+    return equirect
+
+
+def _tile_wrap(pano: np.ndarray) -> np.ndarray:
+    """Copy pano with column 0 repeated after the last column."""
+    h, w = pano.shape[:2]
+    tiled = np.empty((h, w + 1) + pano.shape[2:], pano.dtype)
+    tiled[:, :w] = pano
+    tiled[:, w] = pano[:, 0]
+    return tiled
+
+
 def pano_to_equirectangular(pano: np.ndarray,
-                            output_w: int = 2048,
-                            output_h: int = 1024) -> np.ndarray:
+                            output_w: int = EQUIRECT_W,
+                            output_h: int = EQUIRECT_H,
+                            interpolation: int = cv2.INTER_LINEAR,
+                            out: Optional[np.ndarray] = None) -> np.ndarray:
     h, w = pano.shape[:2]
+    # Tile column 0 after the last column so samples between x = w - 1 and w
+    # still blend across the 360° seam under BORDER_REPLICATE. Vertically the
+    # panorama does not wrap: the output rows that sample below y = h - 1
+    # (about output_h / h of them) repeat the last row. The CUDA warp uses the
+    # same tiling and border, so both builds return the same image.
+    tiled = _tile_wrap(pano)
+    affine = _equirect_affine(w, h, output_w, output_h)
 
-    x_map = np.zeros((output_h, output_w), np.float32)
-    y_map = np.zeros((output_h, output_w), np.float32)
+    if USE_CUDA:
+        return _warp_cuda(tiled, affine, (output_w, output_h), interpolation, out)
 
-    for y in range(output_h):
-        theta = (y / output_h - 0.5) * np.pi
-        for x in range(output_w):
-            phi = (x / output_w - 0.5) * 2 * np.pi
+    return cv2.warpAffine(
+        tiled,
+        affine,
+        (output_w, output_h),
+        dst=out,
+        flags=interpolation | cv2.WARP_INVERSE_MAP,
+        borderMode=cv2.BORDER_REPLICATE
+    )
 
-            xs = 0.5 * w * (phi / np.pi + 1)
-            ys = 0.5 * h * (theta / (np.pi / 2) + 1)
 
-            x_map[y, x] = xs
-            y_map[y, x] = ys
+def _render_webp(pano: np.ndarray, interpolation: int,
+                 save_path: Optional[Path] = None) -> bytes:
+    """Project pano into a pooled output buffer and encode it as WebP.
 
-    return cv2.remap(
-        pano,
-        x_map,
-        y_map,
-        interpolation=cv2.INTER_LINEAR,
-        borderMode=cv2.BORDER_WRAP
-    )
+    Acquire, warp, encode and release run on one thread, so a cancelled request
+    cannot hand the buffer to another request while the warp still writes to it.
+    """
+    out = _acquire_buffer((EQUIRECT_H, EQUIRECT_W) + pano.shape[2:], pano.dtype)
+    try:
+        equirect = pano_to_equirectangular(pano, interpolation=interpolation, out=out)
+        if save_path is not None:
+            save_path.write_bytes(_encode_jpeg(equirect))
+            log.info("Saved stitched image to %s", save_path)
+        return _encode_webp(equirect)
+    finally:
+        _release_buffer(out)
+
+
+INTERPOLATIONS = {
+    "linear": cv2.INTER_LINEAR,
+    "nearest": cv2.INTER_NEAREST,
+}
+
+
+def _interpolation_flag(interpolation: str) -> int:
+    if interpolation not in INTERPOLATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"interpolation must be one of {sorted(INTERPOLATIONS)}"
+        )
+    return INTERPOLATIONS[interpolation]
 
 
 @app.post("/stitch-360")
-async def stitch_360(images: list[UploadFile] = File(...)):
+async def stitch_360(images: list[UploadFile] = File(...), reuse_transform: bool = False,
+                     interpolation: str = "linear"):
     if len(images) < 2:
         raise HTTPException(status_code=400, detail="At least two images required")
+    interp = _interpolation_flag(interpolation)
 
     try:
-        cv_images = [read_image(img) for img in images]
-        pano = stitch_images(cv_images)
-        equirect = pano_to_equirectangular(pano)
-
-        _, encoded = cv2.imencode(".jpg", equirect, [cv2.IMWRITE_JPEG_QUALITY, 95])
-        buffer = io.BytesIO(encoded.tobytes())
+        # All OpenCV work runs off the event loop; cv2 releases the GIL.
+        loop = asyncio.get_running_loop()
+        cv_images = await asyncio.gather(
+            *(loop.run_in_executor(_decode_pool, read_image, img) for img in images)
+        )
+        pano = await asyncio.to_thread(stitch_images, cv_images, reuse_transform)
+        content = await asyncio.to_thread(_render_webp, pano, interp)
 
-        return StreamingResponse(
-            buffer,
-            media_type="image/jpeg",
-            headers={"Content-Disposition": "attachment; filename=360.jpg"}
+        return Response(
+            content=content,
+            media_type="image/webp",
+            headers={"Content-Disposition": "attachment; filename=360.webp"}
         )
 
     except Exception as e:
@@ -111,34 +554,28 @@ async def stitch_360(images: list[UploadFile] = File(...)):
 
 
 @app.post("/stitch-from-folder")
-async def stitch_from_folder(folder_path: str = "Images", save_output: bool = True):
+async def stitch_from_folder(folder_path: str = "Images", save_output: bool = True,
+                             reuse_transform: bool = False, interpolation: str = "linear"):
     """Stitch images from the Images folder and optionally save the result."""
+    interp = _interpolation_flag(interpolation)
+
     try:
         # Load images from folder
-        cv_images = load_images_from_folder(folder_path)
+        cv_images = await asyncio.to_thread(load_images_from_folder, folder_path)
         
-        print(f"Loaded {len(cv_images)} images from {folder_path}")
+        log.info("Loaded %d images from %s", len(cv_images), folder_path)
         
         # Stitch images
-        pano = stitch_images(cv_images)
-        
-        # Convert to equirectangular
-        equirect = pano_to_equirectangular(pano)
-        
-        # Save if requested
-        if save_output:
-            output_path = Path(folder_path).parent / "stitched_output.jpg"
-            cv2.imwrite(str(output_path), equirect)
-            print(f"Saved stitched image to {output_path}")
+        pano = await asyncio.to_thread(stitch_images, cv_images, reuse_transform)
         
-        # Return as response
-        _, encoded = cv2.imencode(".jpg", equirect, [cv2.IMWRITE_JPEG_QUALITY, 95])
-        buffer = io.BytesIO(encoded.tobytes())
+        # Convert to equirectangular, save if requested, and encode the response
+        output_path = Path(folder_path).parent / "stitched_output.jpg" if save_output else None
+        content = await asyncio.to_thread(_render_webp, pano, interp, output_path)
         
-        return StreamingResponse(
-            buffer,
-            media_type="image/jpeg",
-            headers={"Content-Disposition": "attachment; filename=stitched_360.jpg"}
+        return Response(
+            content=content,
+            media_type="image/webp",
+            headers={"Content-Disposition": "attachment; filename=stitched_360.webp"}
         )
         
     except Exception as e:
@@ -146,6 +583,7 @@ async def stitch_from_folder(folder_path: str = "Images", save_output: bool = Tr
 
 
 @app.get("/stitch-from-folder")
-async def stitch_from_folder_get(folder_path: str = "Images", save_output: bool = True):
+async def stitch_from_folder_get(folder_path: str = "Images", save_output: bool = True,
+                                 reuse_transform: bool = False, interpolation: str = "linear"):
     """GET endpoint for stitching images from folder."""
-    return await stitch_from_folder(folder_path, save_output)
+    return await stitch_from_folder(folder_path, save_output, reuse_transform, interpolation)
@@ -0,0 +1,175 @@
+"""Smoke tests for the stitching backend, run against the bundled Images set."""
+
+import io
+import struct
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+import app
+
+IMAGES = Path(__file__).parent / "Images"
+client = TestClient(app.app)
+
+
+def test_stitch_from_folder():
+    params = {"folder_path": str(IMAGES), "save_output": False, "reuse_transform": True}
+    # The second request exercises the cached-transform path.
+    for _ in range(2):
+        response = client.get("/stitch-from-folder", params=params)
+
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"] == "image/webp"
+
+
+def test_reuse_transform(monkeypatch):
+    images = app.load_images_from_folder(str(IMAGES))[-2:]
+    fresh = app.stitch_images(images)
+    assert app._cached_transform is not None
+
+    def fail(images):
+        raise AssertionError("transform was re-estimated")
+
+    monkeypatch.setattr(app, "_estimate_transform", fail)
+    reused = app.stitch_images(images, reuse_transform=True)
+
+    assert np.array_equal(reused, fresh)
+
+
+def _jpeg(orientation: int = 0) -> np.ndarray:
+    """8x16 JPEG, with an EXIF orientation tag unless orientation is 0."""
+    jpeg = cv2.imencode(".jpg", np.zeros((8, 16, 3), np.uint8))[1].tobytes()
+    if orientation:
+        # Big-endian TIFF with a single IFD0 entry holding the orientation.
+        tiff = b"MM" + struct.pack(">HIH", 42, 8, 1) + struct.pack(
+            ">HHIHHI", 0x0112, 3, 1, orientation, 0, 0)
+        app1 = b"Exif\0\0" + tiff
+        jpeg = jpeg[:2] + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1 + jpeg[2:]
+    return np.frombuffer(jpeg, np.uint8)
+
+
+def test_exif_orientation():
+    assert app._exif_orientation(_jpeg()) == 1
+    assert app._exif_orientation(_jpeg(1)) == 1
+
+    # Orientation 6 is a 90° clockwise rotation, which cv2.imdecode applies.
+    rotated = _jpeg(6)
+    assert app._exif_orientation(rotated) == 6
+    assert app._decode(rotated).shape == (16, 8, 3)
+
+
+class _TurboJPEGStub:
+    """Stands in for turbojpeg.TurboJPEG, reporting a fixed header size."""
+
+    def __init__(self, width: int, height: int):
+        self.size = (width, height)
+        self.scaling_factors = []
+
+    def decode_header(self, data):
+        return self.size + (0, 0)
+
+    def decode(self, data, pixel_format, scaling_factor=None):
+        self.scaling_factors.append(scaling_factor)
+        return np.zeros((8, 16, 3), np.uint8)
+
+
+@pytest.mark.parametrize("width, factor", [
+    (4096, None), (4097, (1, 2)), (10000, (1, 4)), (40000, (1, 8)),
+])
+def test_decode_turbojpeg_scaling(monkeypatch, width, factor):
+    tj = _TurboJPEGStub(width, width // 2)
+    monkeypatch.setattr(app, "_tj", tj)
+    monkeypatch.setattr(app, "TJPF_BGR", 0, raising=False)
+
+    app._decode(_jpeg())
+    app._decode(_jpeg(1))
+
+    assert tj.scaling_factors == [factor, factor]
+
+
+def test_decode_rotated_jpeg_bypasses_turbojpeg(monkeypatch):
+    tj = _TurboJPEGStub(16, 8)
+    monkeypatch.setattr(app, "_tj", tj)
+    monkeypatch.setattr(app, "TJPF_BGR", 0, raising=False)
+
+    assert app._decode(_jpeg(6)).shape == (16, 8, 3)
+    assert tj.scaling_factors == []
+
+
+class _ReadOnlyFile:
+    """File object without readinto, like SpooledTemporaryFile before 3.11."""
+
+    def __init__(self, data: bytes):
+        self._buffer = io.BytesIO(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+
+def test_read_image():
+    jpeg = cv2.imencode(".jpg", np.zeros((8, 16, 3), np.uint8))[1].tobytes()
+
+    for file in (io.BytesIO(jpeg), _ReadOnlyFile(jpeg)):
+        img = app.read_image(UploadFile(file, size=len(jpeg)))
+        assert img.shape == (8, 16, 3)
+
+
+@pytest.mark.parametrize("interpolation", [cv2.INTER_LINEAR, cv2.INTER_NEAREST])
+def test_pano_to_equirectangular_matches_remap(interpolation):
+    # A panorama shorter than the output, with w chosen so the last output
+    # columns sample x in [w - 1, w) and blend across the 360° seam.
+    rng = np.random.default_rng(0)
+    pano = rng.integers(0, 256, (333, 1000, 3), np.uint8)
+    h, w = pano.shape[:2]
+    out_w, out_h = app.EQUIRECT_W, app.EQUIRECT_H
+
+    map_x = np.broadcast_to(np.arange(out_w, dtype=np.float32) * (w / out_w), (out_h, out_w))
+    map_y = np.broadcast_to(np.arange(out_h, dtype=np.float32)[:, None] * (h / out_h),
+                            (out_h, out_w))
+    expected = cv2.remap(pano, np.ascontiguousarray(map_x), np.ascontiguousarray(map_y),
+                         interpolation, borderMode=cv2.BORDER_WRAP)
+    equirect = app.pano_to_equirectangular(pano, interpolation=interpolation)
+
+    # Rows sampling below the last panorama row repeat it instead of wrapping
+    # to the top row; every other row, seam columns included, matches exactly.
+    clamped = map_y[:, 0] > h - 1
+    assert clamped.sum() == 3
+    assert np.array_equal(equirect[~clamped], expected[~clamped])
+    assert np.array_equal(equirect[clamped], np.repeat(equirect[clamped][:1], 3, axis=0))
+
+
+
+
+def test_render_webp_pools_only_output():
+    app._render_webp(np.zeros((300, 900, 3), np.uint8), cv2.INTER_LINEAR)
+
+    assert app._buffer_pool
+    assert all(buf.shape == (app.EQUIRECT_H, app.EQUIRECT_W, 3) for buf in app._buffer_pool)
+
+
+def _post_uploads(params: dict):
+    jpeg = _jpeg().tobytes()
+    files = [("images", (f"{i}.jpg", jpeg, "image/jpeg")) for i in range(2)]
+    return client.post("/stitch-360", params=params, files=files)
+
+
+def _get_folder(params: dict):
+    return client.get("/stitch-from-folder",
+                      params={"folder_path": str(IMAGES), "save_output": False, **params})
+
+
+@pytest.mark.parametrize("request_stitch", [_post_uploads, _get_folder])
+def test_interpolation_option(monkeypatch, request_stitch):
+    pano = np.random.default_rng(0).integers(0, 256, (300, 900, 3), np.uint8)
+    monkeypatch.setattr(app, "stitch_images", lambda images, reuse_transform=False: pano)
+
+    response = request_stitch({"interpolation": "nearest"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "image/webp"
+
+    response = request_stitch({"interpolation": "cubic"})
+    assert response.status_code == 400